@@ -7,6 +7,8 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent
 SCREENSHOTS_DIR = BASE_DIR / "screenshots"
 LOGS_DIR = BASE_DIR / "logs"
+BROWSER_CACHE_DIR = BASE_DIR / "browser_cache"
+BROWSER_PROFILE_DIR = BASE_DIR / "browser_profile"
 
 # Create directories if they don't exist
 SCREENSHOTS_DIR.mkdir(exist_ok=True)
@@ -22,14 +24,47 @@ CRYPTO_SYMBOLS = {
 # Screenshot settings
 SCREENSHOT_WIDTH = 1920
 SCREENSHOT_HEIGHT = 1080
-SCREENSHOT_QUALITY = 100
+SCREENSHOT_FORMAT = "jpeg"  # "jpeg" or "png"
+SCREENSHOT_QUALITY = 85  # JPEG only; ignored for PNG
+
+# Thumbnails (width, height) kept in memory for previews; needs pyvips/libvips
+THUMBNAIL_SIZES = [(640, 360)]
+THUMBNAIL_QUALITY = 80
 
 # Browser settings
 BROWSER_HEADLESS = True
 BROWSER_TIMEOUT = 30000  # 30 seconds
+BROWSER_INSTANCES = 1  # Chromium processes; pages are spread round-robin
+BROWSER_USER_DATA_DIR = BROWSER_PROFILE_DIR  # Persistent profile; None for throwaway incognito contexts
+# Chromium disk cache under BROWSER_CACHE_DIR (point it at tmpfs for faster warm
+# loads); only used with a persistent profile, incognito caches stay in memory
+BROWSER_CACHE_SIZE = 256 * 1024 * 1024
+CONCURRENT_TABS = 3  # Max symbols captured at the same time
+PAGE_RECYCLE_TICKS = 60  # Reopen each persistent chart page after this many captures
+CHART_READY_POLL_MS = 100  # How often to check whether the chart has rendered
+
+# Analytics and ad domains (and their subdomains) blocked inside Chromium; all
+# other requests load normally so the HTTP cache keeps working
+BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "sentry.io",
+)
 
 # Scheduling settings
 SCREENSHOT_INTERVAL_MINUTES = 1
 
+# Cached screenshots older than this (seconds) are refreshed in the background
+# when requested; HTTP consumers should send SCREENSHOT_CACHE_CONTROL with them.
+# One capture interval plus slack for the tick itself, so get() only captures
+# when the capture loop has fallen behind rather than racing every tick
+SCREENSHOT_CACHE_MAX_AGE = SCREENSHOT_INTERVAL_MINUTES * 60 + 30
+SCREENSHOT_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+
+# Frames kept in memory per symbol; they are written to disk once the buffer
+# fills up and when the pipeline stops
+FRAME_BUFFER_SIZE = 60
+
 # File naming
 TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
@@ -1,17 +1,27 @@
 """Main pipeline for automated TradingView screenshot capture."""
 
 import asyncio
+import atexit
 import logging
+import queue
 import signal
 import sys
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
+try:
+    import uvloop
+except ImportError:
+    # uvloop is optional (and unavailable on Windows); fall back to asyncio's loop
+    uvloop = None
 
 from tradingview_scraper import TradingViewScraper
-from config import SCREENSHOT_INTERVAL_MINUTES, LOGS_DIR
+from config import (
+    CRYPTO_SYMBOLS, SCREENSHOT_INTERVAL_MINUTES, SCREENSHOT_CACHE_MAX_AGE, LOGS_DIR
+)
 
 
 class ScreenshotPipeline:
@@ -19,13 +29,14 @@ class ScreenshotPipeline:
     
     def __init__(self):
         self.scraper = TradingViewScraper()
-        self.scheduler = AsyncIOScheduler()
         self.logger = self._setup_logger()
         self.running = False
-        
-        # Setup signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        self._interval = SCREENSHOT_INTERVAL_MINUTES * 60
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        # Last-known-good screenshot bytes per symbol, with their monotonic capture time
+        self._cache: Dict[str, Tuple[bytes, float]] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
     
     def _setup_logger(self) -> logging.Logger:
         """Set up logging configuration with file output."""
@@ -39,7 +50,6 @@ class ScreenshotPipeline:
                 '%(asctime)s - %(levelname)s - %(message)s'
             )
             console_handler.setFormatter(console_formatter)
-            logger.addHandler(console_handler)
             
             # File handler
             log_file = LOGS_DIR / f"pipeline_{datetime.now().strftime('%Y%m%d')}.log"
@@ -48,14 +58,58 @@ class ScreenshotPipeline:
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
             file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
+            
+            # Callers only enqueue records; a listener thread does the actual
+            # console/file writes so the event loop never blocks on IO. The
+            # handler lives on the module logger, so the listener belongs to the
+            # process rather than to one pipeline and is drained at exit
+            log_queue = queue.Queue(-1)
+            logger.addHandler(QueueHandler(log_queue))
+            log_listener = QueueListener(log_queue, console_handler, file_handler)
+            log_listener.start()
+            atexit.register(log_listener.stop)
         
         return logger
     
-    def _signal_handler(self, signum, frame):
+    def _install_signal_handlers(self):
+        """Route SIGINT/SIGTERM through the running event loop."""
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self._signal_handler, signum)
+            except NotImplementedError:
+                # Not supported on Windows; Ctrl+C still raises KeyboardInterrupt
+                pass
+    
+    def _remove_signal_handlers(self):
+        """Restore default signal handling once the pipeline has stopped."""
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.remove_signal_handler(signum)
+            except NotImplementedError:
+                pass
+    
+    def _signal_handler(self, signum):
         """Handle shutdown signals gracefully."""
         self.logger.info(f"Received signal {signum}, shutting down...")
         self.running = False
+        
+        # Wake the capture loop so it doesn't sit out the rest of the interval
+        self._wake.set()
+    
+    async def _run_loop(self):
+        """Capture screenshots every interval until the pipeline is stopped."""
+        while self.running:
+            started = time.monotonic()
+            await self.capture_screenshots_job()
+            
+            # Sleep for the rest of the interval so ticks don't drift
+            remaining = max(0, self._interval - (time.monotonic() - started))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
     
     async def capture_screenshots_job(self):
         """Job function to capture screenshots for all symbols."""
@@ -72,6 +126,7 @@ class ScreenshotPipeline:
             
             for symbol, filepath in results.items():
                 if filepath:
+                    self._update_cache(symbol)
                     self.logger.info(f"✓ {symbol}: {Path(filepath).name}")
                 else:
                     self.logger.error(f"✗ {symbol}: Failed to capture")
@@ -79,36 +134,74 @@ class ScreenshotPipeline:
         except Exception as e:
             self.logger.error(f"Error in screenshot job: {e}")
     
+    def _update_cache(self, symbol: str) -> None:
+        """Store the scraper's latest frame for a symbol as last-known-good."""
+        data = self.scraper.get_frame(symbol)
+        if data is not None:
+            # Single assignment, so readers never see bytes and age out of step
+            self._cache[symbol] = (data, time.monotonic())
+    
+    async def _refresh(self, symbol: str) -> None:
+        """Capture a fresh screenshot for a symbol and update the cache."""
+        try:
+            if await self.scraper.capture_screenshot(symbol, CRYPTO_SYMBOLS[symbol]):
+                self._update_cache(symbol)
+        except Exception as e:
+            # e.g. the browser isn't started; callers keep whatever is cached
+            self.logger.error(f"Failed to refresh {symbol}: {e}")
+        finally:
+            self._refreshing.pop(symbol, None)
+    
+    def _start_refresh(self, symbol: str) -> asyncio.Task:
+        """Return the in-flight refresh for a symbol, starting one if needed."""
+        task = self._refreshing.get(symbol)
+        if task is None:
+            task = asyncio.create_task(self._refresh(symbol))
+            self._refreshing[symbol] = task
+        return task
+    
+    async def get(self, symbol: str) -> Optional[bytes]:
+        """Return the latest screenshot bytes for a symbol (stale-while-revalidate).
+        
+        Cached bytes are returned immediately; if they are older than
+        SCREENSHOT_CACHE_MAX_AGE a refresh is started in the background.
+        Only a cold cache waits for a capture.
+        """
+        if symbol not in CRYPTO_SYMBOLS:
+            raise KeyError(f"Unknown symbol: {symbol}")
+        
+        cached = self._cache.get(symbol)
+        if cached is None:
+            # Shielded: the refresh is shared, so one cancelled caller mustn't
+            # cancel it for everyone else waiting on it
+            await asyncio.shield(self._start_refresh(symbol))
+            cached = self._cache.get(symbol)
+            return cached[0] if cached else None
+        
+        data, captured_at = cached
+        if time.monotonic() - captured_at > SCREENSHOT_CACHE_MAX_AGE:
+            self._start_refresh(symbol)
+        
+        return data
+    
     async def start(self):
         """Start the screenshot pipeline."""
         try:
             self.logger.info("Starting TradingView Screenshot Pipeline...")
             
+            # Setup signal handlers for graceful shutdown
+            self.running = True
+            self._install_signal_handlers()
+            
             # Initialize browser
             await self.scraper.start_browser()
             
-            # Schedule the job to run every minute
-            self.scheduler.add_job(
-                self.capture_screenshots_job,
-                trigger=IntervalTrigger(minutes=SCREENSHOT_INTERVAL_MINUTES),
-                id='screenshot_job',
-                name='TradingView Screenshot Capture',
-                max_instances=1  # Prevent overlapping jobs
-            )
-            
-            # Start scheduler
-            self.scheduler.start()
-            self.running = True
-            
             self.logger.info(f"Pipeline started. Screenshots will be captured every {SCREENSHOT_INTERVAL_MINUTES} minute(s)")
             self.logger.info("Press Ctrl+C to stop the pipeline")
             
-            # Run initial capture
-            await self.capture_screenshots_job()
-            
-            # Keep the pipeline running
-            while self.running:
-                await asyncio.sleep(1)
+            # A single loop task runs captures back to back, so jobs never overlap
+            self._task = asyncio.create_task(self._run_loop())
+            await self._task
                 
         except KeyboardInterrupt:
             self.logger.info("Pipeline interrupted by user")
@@ -121,10 +214,27 @@ class ScreenshotPipeline:
         """Stop the pipeline and cleanup resources."""
         self.logger.info("Stopping pipeline...")
         
-        if self.scheduler.running:
-            self.scheduler.shutdown()
+        self.running = False
+        self._wake.set()
+        
+        if self._task and not self._task.done():
+            self._task.cancel()
+            # Let the capture loop unwind before its buffered frames are flushed
+            await asyncio.gather(self._task, return_exceptions=True)
+        
+        refreshing = list(self._refreshing.values())
+        for task in refreshing:
+            task.cancel()
+        await asyncio.gather(*refreshing, return_exceptions=True)
+        
+        # Screenshots are buffered in memory, so write out what's left
+        try:
+            await self.scraper.flush_to_disk()
+        except Exception as e:
+            self.logger.error(f"Failed to flush screenshots: {e}")
         
         await self.scraper.close_browser()
+        self._remove_signal_handlers()
         
         self.logger.info("Pipeline stopped successfully")
 
@@ -136,6 +246,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        # Faster event loop for the CDP WebSocket traffic behind every screenshot
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -0,0 +1,86 @@
+"""Unit tests for ScreenshotPipeline.get() stale-while-revalidate caching."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import screenshot_pipeline
+from screenshot_pipeline import ScreenshotPipeline
+
+
+class FakeScraper:
+    """Counts captures and serves a scripted frame for each one."""
+    
+    def __init__(self):
+        self.captures = 0
+        self.frame = None
+    
+    async def capture_screenshot(self, symbol, url):
+        self.captures += 1
+        await asyncio.sleep(0.01)
+        self.frame = f"{symbol}-{self.captures}".encode()
+        return f"{symbol}.jpg"
+    
+    def get_frame(self, symbol):
+        return self.frame
+
+
+class PipelineCacheTests(unittest.IsolatedAsyncioTestCase):
+    
+    async def asyncSetUp(self):
+        self.pipeline = ScreenshotPipeline()
+        self.scraper = FakeScraper()
+        self.pipeline.scraper = self.scraper
+    
+    async def asyncTearDown(self):
+        await asyncio.gather(*self.pipeline._refreshing.values(), return_exceptions=True)
+    
+    async def test_cold_get_waits_for_capture(self):
+        self.assertEqual(await self.pipeline.get("BTC"), b"BTC-1")
+        self.assertEqual(self.scraper.captures, 1)
+    
+    async def test_cancelled_cold_get_does_not_cancel_other_callers(self):
+        first = asyncio.create_task(self.pipeline.get("BTC"))
+        second = asyncio.create_task(self.pipeline.get("BTC"))
+        await asyncio.sleep(0)
+        
+        first.cancel()
+        
+        self.assertEqual(await second, b"BTC-1")
+        self.assertTrue(first.cancelled())
+        self.assertEqual(self.scraper.captures, 1)
+    
+    async def test_fresh_cache_is_served_without_refresh(self):
+        await self.pipeline.get("BTC")
+        
+        self.assertEqual(await self.pipeline.get("BTC"), b"BTC-1")
+        self.assertEqual(self.scraper.captures, 1)
+        self.assertEqual(self.pipeline._refreshing, {})
+    
+    async def test_stale_cache_is_served_and_refreshed_once(self):
+        await self.pipeline.get("BTC")
+        
+        with mock.patch.object(screenshot_pipeline, "SCREENSHOT_CACHE_MAX_AGE", -1):
+            first, second = await asyncio.gather(
+                self.pipeline.get("BTC"), self.pipeline.get("BTC")
+            )
+            self.assertEqual((first, second), (b"BTC-1", b"BTC-1"))
+            
+            await self.pipeline._refreshing["BTC"]
+        
+        self.assertEqual(self.scraper.captures, 2)
+        self.assertEqual(await self.pipeline.get("BTC"), b"BTC-2")
+    
+    async def test_cold_get_without_browser_returns_none(self):
+        self.pipeline.scraper = screenshot_pipeline.TradingViewScraper()
+        
+        with self.assertLogs(self.pipeline.logger, "ERROR"):
+            self.assertIsNone(await self.pipeline.get("BTC"))
+    
+    async def test_unknown_symbol_raises(self):
+        with self.assertRaises(KeyError):
+            await self.pipeline.get("DOGE")
+
+
+if __name__ == "__main__":
+    unittest.main()
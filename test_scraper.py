@@ -0,0 +1,283 @@
+"""Unit tests for TradingViewScraper using fake Playwright pages."""
+
+import asyncio
+import os
+import re
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import tradingview_scraper
+from tradingview_scraper import TradingViewScraper, _blocked_url_patterns
+
+
+def chromium_url_match(pattern, url):
+    """Match a URL the way Network.setBlockedURLs does: '*' matches anything."""
+    return re.fullmatch(".*".join(map(re.escape, pattern.split("*"))), url) is not None
+
+
+class FakeCDPSession:
+    """Records the CDP commands sent for a page."""
+    
+    def __init__(self):
+        self.sent = []
+    
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+
+
+class FakePage:
+    """Minimal stand-in for a Playwright Page."""
+    
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+        self.frames = [b"frame"]
+        self.cdp = FakeCDPSession()
+    
+    def is_closed(self):
+        return self.closed
+    
+    async def close(self):
+        self.closed = True
+    
+    async def goto(self, url, timeout=None):
+        self.context.in_flight += 1
+        self.context.max_in_flight = max(self.context.max_in_flight, self.context.in_flight)
+        await asyncio.sleep(0.01)
+    
+    async def wait_for_selector(self, selector, timeout=None):
+        await asyncio.sleep(0.01)
+    
+    async def wait_for_function(self, script, timeout=None, polling=None):
+        pass
+    
+    async def evaluate(self, script):
+        return None
+    
+    async def screenshot(self, **options):
+        if self.closed:
+            raise RuntimeError("Target page has been closed")
+        await asyncio.sleep(0.01)
+        if self.context.in_flight:
+            self.context.in_flight -= 1
+        # Repeats the last frame once the scripted ones run out
+        return self.frames.pop(0) if len(self.frames) > 1 else self.frames[0]
+
+
+class FakeContext:
+    """Minimal stand-in for a Playwright BrowserContext."""
+    
+    def __init__(self):
+        self.pages = []
+        # Pages between navigation and their screenshot, and the peak of that
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+    
+    async def new_cdp_session(self, page):
+        return page.cdp
+
+
+class ScraperTestCase(unittest.IsolatedAsyncioTestCase):
+    """Builds a scraper wired to a fake context and a temporary screenshot dir."""
+    
+    frame_buffer_size = 3
+    
+    def setUp(self):
+        patches = [
+            mock.patch.object(tradingview_scraper, "FRAME_BUFFER_SIZE", self.frame_buffer_size),
+            mock.patch.object(tradingview_scraper, "THUMBNAIL_SIZES", []),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.screenshots_dir = tmp.name
+        
+        self.context = FakeContext()
+        self.scraper = TradingViewScraper()
+        self.scraper.contexts = [self.context]
+        self.scraper._dir_prefix = self.screenshots_dir + os.sep
+    
+    async def capture(self, symbol="BTC", frames=None):
+        if frames is not None:
+            page = await self.scraper._ensure_page(symbol, "https://example.com")
+            page.frames = list(frames)
+        return await self.scraper.capture_screenshot(symbol, "https://example.com")
+
+
+class FrameBufferTests(ScraperTestCase):
+    
+    async def test_unchanged_chart_reuses_previous_frame(self):
+        first = await self.capture(frames=[b"same", b"same"])
+        second = await self.capture()
+        
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.scraper._frames["BTC"]), 1)
+        self.assertEqual(self.scraper._unflushed["BTC"], 1)
+    
+    async def test_frames_are_kept_in_memory_until_buffer_fills(self):
+        paths = [await self.capture(frames=[b"a", b"b", b"c"]), await self.capture()]
+        
+        self.assertEqual(self.scraper.get_frame("BTC"), b"b")
+        self.assertEqual(os.listdir(self.screenshots_dir), [])
+        
+        paths.append(await self.capture())
+        
+        self.assertEqual(self.scraper._unflushed["BTC"], 0)
+        self.assertEqual(len(os.listdir(self.screenshots_dir)), 3)
+        for path, expected in zip(paths, [b"a", b"b", b"c"]):
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), expected)
+    
+    async def test_flush_to_disk_writes_pending_frames(self):
+        path = await self.capture(frames=[b"a"])
+        
+        self.assertEqual(await self.scraper.flush_to_disk(), 1)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"a")
+        self.assertEqual(await self.scraper.flush_to_disk(), 0)
+
+
+class FlushFailureTests(ScraperTestCase):
+    
+    frame_buffer_size = 10
+    
+    async def test_failed_write_keeps_remaining_frames_pending(self):
+        await self.capture(frames=[b"1", b"2", b"3", b"4"])
+        await self.capture()
+        
+        # Frames 3 and 4 point at a directory that doesn't exist yet
+        missing_dir = os.path.join(self.screenshots_dir, "missing")
+        self.scraper._dir_prefix = missing_dir + os.sep
+        await self.capture()
+        await self.capture()
+        
+        self.assertEqual(await self.scraper.flush_to_disk(), 2)
+        self.assertEqual(self.scraper._unflushed["BTC"], 2)
+        
+        os.mkdir(missing_dir)
+        self.assertEqual(await self.scraper.flush_to_disk(), 2)
+        self.assertEqual(self.scraper._unflushed["BTC"], 0)
+    
+    async def test_write_error_does_not_fail_capture(self):
+        with mock.patch.object(tradingview_scraper, "FRAME_BUFFER_SIZE", 1):
+            self.scraper._dir_prefix = os.path.join(self.screenshots_dir, "missing") + os.sep
+            page = await self.scraper._ensure_page("BTC", "https://example.com")
+            
+            self.assertIsNotNone(await self.capture())
+            self.assertIs(self.scraper._cached_page("BTC"), page)
+
+
+class RequestBlockingTests(ScraperTestCase):
+    
+    def test_patterns_cover_domain_and_subdomains(self):
+        with mock.patch.object(tradingview_scraper, "BLOCKED_DOMAINS", ("doubleclick.net",)):
+            self.assertEqual(
+                _blocked_url_patterns(),
+                ["*://doubleclick.net/*", "*://*.doubleclick.net/*"],
+            )
+    
+    def test_patterns_block_analytics_hosts(self):
+        for url in (
+            "https://www.google-analytics.com/analytics.js",
+            "https://googletagmanager.com/gtm.js?id=GTM-1",
+            "https://o1.ingest.sentry.io/api/1/envelope/",
+        ):
+            self.assertTrue(
+                any(chromium_url_match(pattern, url) for pattern in _blocked_url_patterns()), url
+            )
+    
+    def test_tradingview_and_lookalike_hosts_are_not_blocked(self):
+        for url in (
+            "https://www.tradingview.com/chart/?symbol=BINANCE%3ABTCUSDT",
+            "https://s3.tradingview.com/charting_library/bundles/library.js",
+            "wss://data.tradingview.com/socket.io/websocket",
+            "https://notdoubleclick.net/pixel.gif",
+        ):
+            self.assertFalse(
+                any(chromium_url_match(pattern, url) for pattern in _blocked_url_patterns()), url
+            )
+    
+    async def test_new_pages_get_blocklist(self):
+        page = await self.scraper._navigate("BTC", "https://example.com")
+        
+        self.assertIn(("Network.setBlockedURLs", {"urls": _blocked_url_patterns()}), page.cdp.sent)
+
+
+class ConcurrentCaptureTests(ScraperTestCase):
+    
+    async def test_refresh_during_tick_does_not_open_a_second_page(self):
+        results, single = await asyncio.gather(
+            self.scraper.capture_all_screenshots(),
+            self.scraper.capture_screenshot("BTC", "https://example.com"),
+        )
+        
+        self.assertEqual(len(self.context.pages), len(results))
+        self.assertFalse(any(page.closed for page in self.context.pages))
+        self.assertIsNotNone(single)
+    
+    async def test_recycle_never_closes_a_page_in_use(self):
+        with mock.patch.object(tradingview_scraper, "PAGE_RECYCLE_TICKS", 1):
+            results, single = await asyncio.gather(
+                self.scraper.capture_all_screenshots(),
+                self.scraper.capture_screenshot("BTC", "https://example.com"),
+            )
+        
+        self.assertTrue(all(results.values()))
+        self.assertIsNotNone(single)
+    
+    async def test_tick_and_refresh_share_the_tab_limit(self):
+        self.scraper._tabs = asyncio.Semaphore(1)
+        
+        await asyncio.gather(
+            self.scraper.capture_all_screenshots(),
+            self.scraper.capture_screenshot("ETH", "https://example.com"),
+        )
+        
+        self.assertEqual(self.context.max_in_flight, 1)
+        self.assertFalse(self.scraper._tabs.locked())
+
+
+class CaptureBatchTests(ScraperTestCase):
+    
+    async def test_past_timestamps_are_rejected(self):
+        past = datetime.now() - timedelta(minutes=5)
+        
+        with self.assertRaises(ValueError):
+            await self.scraper.capture_batch([("BTC", "https://example.com", past)])
+    
+    async def test_timezone_aware_timestamps_are_accepted(self):
+        when = datetime.now(timezone.utc) + timedelta(milliseconds=20)
+        
+        results = await self.scraper.capture_batch([("BTC", "https://example.com", when)])
+        
+        self.assertIsNotNone(results[("BTC", when)])
+    
+    async def test_sub_second_batch_writes_every_frame(self):
+        page = await self.scraper._ensure_page("BTC", "https://example.com")
+        page.frames = [b"1", b"2", b"3"]
+        start = datetime.now() + timedelta(milliseconds=20)
+        jobs = [("BTC", "https://example.com", start + timedelta(milliseconds=100 * i)) for i in range(3)]
+        
+        results = await self.scraper.capture_batch(jobs)
+        await self.scraper.flush_to_disk()
+        
+        paths = [results[("BTC", taken_at)] for _, _, taken_at in jobs]
+        self.assertEqual(len(set(paths)), 3)
+        self.assertEqual(len(os.listdir(self.screenshots_dir)), 3)
+        for path, expected in zip(paths, [b"1", b"2", b"3"]):
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,23 +2,116 @@
 
 import asyncio
 import logging
-from datetime import datetime
+import os
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Deque, Dict, List, Optional, Set, Tuple
 
-from playwright.async_api import async_playwright, Browser, Page
+import aiofiles
+import xxhash
+try:
+    import pyvips
+except (ImportError, OSError):
+    # pyvips is optional; it also fails to import when libvips itself is missing
+    pyvips = None
+from playwright.async_api import (
+    async_playwright, Browser, BrowserContext, Page, Playwright
+)
 from config import (
     CRYPTO_SYMBOLS, SCREENSHOTS_DIR, SCREENSHOT_WIDTH, SCREENSHOT_HEIGHT,
-    BROWSER_HEADLESS, BROWSER_TIMEOUT, TIMESTAMP_FORMAT
+    SCREENSHOT_FORMAT, SCREENSHOT_QUALITY, THUMBNAIL_SIZES, THUMBNAIL_QUALITY,
+    BROWSER_HEADLESS, BROWSER_TIMEOUT, BROWSER_INSTANCES, BROWSER_USER_DATA_DIR,
+    BROWSER_CACHE_DIR, BROWSER_CACHE_SIZE, CONCURRENT_TABS,
+    PAGE_RECYCLE_TICKS, CHART_READY_POLL_MS, FRAME_BUFFER_SIZE, BLOCKED_DOMAINS,
+    TIMESTAMP_FORMAT
 )
 
 
+SCREENSHOT_EXTENSION = "jpg" if SCREENSHOT_FORMAT == "jpeg" else SCREENSHOT_FORMAT
+
+# Slack for batch jobs scheduled "now" that are a moment old by the time they're checked
+_BATCH_PAST_TOLERANCE = timedelta(seconds=1)
+
+# Injected at document start to hide UI that shouldn't appear in screenshots
+_HIDE_UI_JS = """
+    (() => {
+        const style = document.createElement('style');
+        style.textContent = '[data-name="header"], [data-name="bottom-toolbar"] { display: none !important; }';
+        (document.head || document.documentElement).appendChild(style);
+    })();
+"""
+
+# Bounding box of the chart area, or null when it can't be found
+_CHART_BBOX_JS = """
+    () => {
+        const el = document.querySelector('.chart-container');
+        if (!el) return null;
+        const r = el.getBoundingClientRect();
+        if (r.width === 0 || r.height === 0) return null;
+        return {x: r.x, y: r.y, width: r.width, height: r.height};
+    }
+"""
+
+# Resolves once a chart canvas with a real size is present on the page
+_CHART_READY_JS = """
+    () => Array.from(document.querySelectorAll('canvas'))
+        .some(c => c.width > 100 && c.height > 100)
+"""
+
+
+def _blocked_url_patterns() -> List[str]:
+    """Return CDP URL patterns matching BLOCKED_DOMAINS and their subdomains."""
+    patterns = []
+    for domain in BLOCKED_DOMAINS:
+        patterns.append(f"*://{domain}/*")
+        patterns.append(f"*://*.{domain}/*")
+    return patterns
+
+
+def _make_thumbnails(data: bytes) -> Dict[Tuple[int, int], bytes]:
+    """Resize an encoded screenshot to every configured thumbnail size with libvips."""
+    image = pyvips.Image.new_from_buffer(data, "")
+    return {
+        (width, height): image.thumbnail_image(width, height=height).jpegsave_buffer(Q=THUMBNAIL_QUALITY)
+        for width, height in THUMBNAIL_SIZES
+    }
+
+
 class TradingViewScraper:
     """Handles browser automation and screenshot capture for TradingView charts."""
     
     def __init__(self):
+        self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
+        self.browsers: List[Browser] = []
+        self.contexts: List[BrowserContext] = []
+        self._next_context = 0
+        self._tabs = asyncio.Semaphore(CONCURRENT_TABS)
+        self._pages: Dict[str, Page] = {}
+        # Held from loading a symbol's page until its screenshot is taken, so
+        # concurrent callers never open a second page or recycle one in use
+        self._symbol_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._page_ticks: Dict[str, int] = {}
+        self._clips: Dict[str, Optional[Dict[str, float]]] = {}
+        self._last_hash: Dict[str, str] = {}
+        self._last_path: Dict[str, str] = {}
+        # Last file timestamp per symbol and how many shots already used it
+        self._name_seq: Dict[str, Tuple[str, int]] = {}
+        self._frames: Dict[str, Deque[Tuple[str, bytes]]] = defaultdict(
+            lambda: deque(maxlen=FRAME_BUFFER_SIZE)
+        )
+        self._unflushed: Dict[str, int] = defaultdict(int)
+        self._flush_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._thumbnails: Dict[str, Dict[Tuple[int, int], bytes]] = {}
+        self._thumbnail_tasks: Set[asyncio.Task] = set()
+        self._latest_thumbnail_task: Dict[str, asyncio.Task] = {}
+        # Precomputed so the hot path builds file paths with a single f-string
+        self._dir_prefix = str(SCREENSHOTS_DIR) + os.sep
         self.logger = self._setup_logger()
+        
+        if THUMBNAIL_SIZES and pyvips is None:
+            self.logger.warning("pyvips not available, thumbnails are disabled")
     
     def _setup_logger(self) -> logging.Logger:
         """Set up logging configuration."""
@@ -36,23 +129,102 @@ class TradingViewScraper:
         return logger
     
     async def start_browser(self) -> None:
-        """Initialize the browser instance."""
+        """Initialize the browser instances and their shared contexts."""
+        launch_args = ['--no-sandbox', '--disable-dev-shm-usage']
+        context_options = {
+            "viewport": {"width": SCREENSHOT_WIDTH, "height": SCREENSHOT_HEIGHT},
+        }
+        
         try:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(
-                headless=BROWSER_HEADLESS,
-                args=['--no-sandbox', '--disable-dev-shm-usage']
-            )
-            self.logger.info("Browser started successfully")
+            self.playwright = await async_playwright().start()
+            for i in range(max(1, BROWSER_INSTANCES)):
+                # One context per browser, shared by all of its pages so the
+                # HTTP cache warmed by one symbol is reused by the others
+                if BROWSER_USER_DATA_DIR:
+                    # Persistent profile keeps the disk cache across pipeline
+                    # restarts; each process needs its own profile and cache
+                    # dir since Chromium locks them while running
+                    context = await self.playwright.chromium.launch_persistent_context(
+                        str(Path(BROWSER_USER_DATA_DIR) / f"instance_{i}"),
+                        headless=BROWSER_HEADLESS,
+                        args=launch_args + [
+                            f"--disk-cache-dir={BROWSER_CACHE_DIR / f'instance_{i}'}",
+                            f"--disk-cache-size={BROWSER_CACHE_SIZE}",
+                        ],
+                        **context_options
+                    )
+                else:
+                    # Incognito context: the HTTP cache lives in memory only
+                    browser = await self.playwright.chromium.launch(
+                        headless=BROWSER_HEADLESS, args=launch_args
+                    )
+                    self.browsers.append(browser)
+                    context = await browser.new_context(**context_options)
+                
+                # Hide the header and bottom toolbar from document start, so
+                # no per-page evaluate round-trip is needed after load
+                await context.add_init_script(script=_HIDE_UI_JS)
+                self.contexts.append(context)
+            
+            self.browser = self.browsers[0] if self.browsers else None
+            self.logger.info(f"Browser started successfully ({len(self.contexts)} instance(s))")
         except Exception as e:
             self.logger.error(f"Failed to start browser: {e}")
             raise
+        
+        await self.warm_pages()
+    
+    async def warm_pages(self) -> None:
+        """Pre-allocate and load one chart page per configured symbol."""
+        async def warm(symbol: str, url: str) -> None:
+            async with self._symbol_locks[symbol], self._tabs:
+                try:
+                    await self._ensure_page(symbol, url)
+                except Exception as e:
+                    # Not fatal: the first capture will retry opening the page
+                    self.logger.warning(f"Could not pre-load {symbol} chart: {e}")
+        
+        await asyncio.gather(*[warm(symbol, url) for symbol, url in CRYPTO_SYMBOLS.items()])
     
     async def close_browser(self) -> None:
-        """Close the browser instance."""
-        if self.browser:
-            await self.browser.close()
+        """Close the cached pages and browser instances."""
+        # Executor jobs can't be cancelled, so let in-flight thumbnails finish
+        await asyncio.gather(*self._thumbnail_tasks, return_exceptions=True)
+        
+        for symbol in list(self._pages):
+            await self._recycle_page(symbol)
+        
+        for context in self.contexts:
+            await context.close()
+        for browser in self.browsers:
+            await browser.close()
+        if self.contexts:
             self.logger.info("Browser closed")
+        self.contexts = []
+        self.browsers = []
+        self.browser = None
+        
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+    
+    def _pick_context(self) -> BrowserContext:
+        """Return the next browser context in round-robin order."""
+        context = self.contexts[self._next_context % len(self.contexts)]
+        self._next_context += 1
+        return context
+    
+    async def _block_requests(self, page: Page) -> None:
+        """Block analytics/ad domains for a page inside Chromium.
+        
+        Uses CDP Network.setBlockedURLs rather than page/context.route: Playwright
+        routing disables the HTTP cache and adds a Python round-trip per request.
+        """
+        if not BLOCKED_DOMAINS:
+            return
+        session = await page.context.new_cdp_session(page)
+        await session.send("Network.enable")
+        await session.send("Network.setBlockedURLs", {"urls": _blocked_url_patterns()})
     
     async def _wait_for_chart_load(self, page: Page) -> None:
         """Wait for TradingView chart to fully load."""
@@ -60,81 +232,319 @@ class TradingViewScraper:
             # Wait for the chart container to be visible
             await page.wait_for_selector('[data-name="legend-source-item"]', timeout=BROWSER_TIMEOUT)
             
-            # Additional wait for chart data to load
-            await asyncio.sleep(3)
+            # Wait until the chart canvas has actually been laid out
+            await page.wait_for_function(
+                _CHART_READY_JS, timeout=BROWSER_TIMEOUT, polling=CHART_READY_POLL_MS
+            )
             
             self.logger.info("Chart loaded successfully")
         except Exception as e:
             self.logger.warning(f"Chart loading timeout or error: {e}")
             # Continue anyway, might still capture something useful
     
-    async def _configure_chart_view(self, page: Page) -> None:
-        """Configure chart for optimal screenshot capture."""
-        try:
-            # Try to hide unnecessary UI elements for cleaner screenshots
-            await page.evaluate("""
-                // Hide header if possible
-                const header = document.querySelector('[data-name="header"]');
-                if (header) header.style.display = 'none';
-                
-                // Hide bottom toolbar if possible
-                const toolbar = document.querySelector('[data-name="bottom-toolbar"]');
-                if (toolbar) toolbar.style.display = 'none';
-            """)
-            
-            self.logger.info("Chart view configured")
-        except Exception as e:
-            self.logger.warning(f"Could not configure chart view: {e}")
+    def _cached_page(self, symbol: str) -> Optional[Page]:
+        """Return the loaded page for a symbol, if it is still open."""
+        page = self._pages.get(symbol)
+        if page and not page.is_closed():
+            return page
+        return None
     
-    async def capture_screenshot(self, symbol: str, url: str) -> Optional[str]:
-        """Capture a screenshot for a specific cryptocurrency symbol."""
-        if not self.browser:
-            raise RuntimeError("Browser not initialized. Call start_browser() first.")
-        
-        page = None
+    async def _navigate(self, symbol: str, url: str) -> Page:
+        """Stage 1: open a new page and start loading the symbol's chart."""
+        page = await self._pick_context().new_page()
         try:
-            # Create new page
-            page = await self.browser.new_page()
-            await page.set_viewport_size({"width": SCREENSHOT_WIDTH, "height": SCREENSHOT_HEIGHT})
+            await self._block_requests(page)
             
             self.logger.info(f"Navigating to {symbol} chart...")
             await page.goto(url, timeout=BROWSER_TIMEOUT)
-            
+        except Exception:
+            await page.close()
+            raise
+        return page
+    
+    async def _wait_ready(self, symbol: str, page: Page) -> Page:
+        """Stage 2: wait for the chart, measure its clip box and cache the page."""
+        try:
             # Wait for chart to load
             await self._wait_for_chart_load(page)
             
-            # Configure chart view
-            await self._configure_chart_view(page)
-            
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
-            filename = f"{symbol}_{timestamp}.png"
-            filepath = SCREENSHOTS_DIR / filename
-            
-            # Take screenshot
-            await page.screenshot(path=str(filepath), full_page=False)
-            
-            self.logger.info(f"Screenshot saved: {filepath}")
-            return str(filepath)
-            
+            # Only the chart area is captured, so hidden UI isn't encoded;
+            # measured once per page and reused by later ticks
+            self._clips[symbol] = await page.evaluate(_CHART_BBOX_JS)
+        except Exception:
+            await page.close()
+            raise
+        
+        self._pages[symbol] = page
+        self._page_ticks[symbol] = 0
+        return page
+    
+    async def _ensure_page(self, symbol: str, url: str) -> Page:
+        """Return the cached page for a symbol, opening and loading it on first use."""
+        page = self._cached_page(symbol)
+        if page:
+            return page
+        
+        page = await self._navigate(symbol, url)
+        return await self._wait_ready(symbol, page)
+    
+    async def _recycle_page(self, symbol: str) -> None:
+        """Close the cached page for a symbol."""
+        page = self._pages.pop(symbol, None)
+        self._page_ticks.pop(symbol, None)
+        self._clips.pop(symbol, None)
+        if page:
+            try:
+                await page.close()
+            except Exception as e:
+                self.logger.warning(f"Could not close page for {symbol}: {e}")
+    
+    async def _take_screenshot(self, page: Page, clip: Optional[Dict[str, float]] = None) -> bytes:
+        """Return the encoded screenshot bytes for a page, optionally cropped to clip."""
+        options = {"full_page": False, "type": SCREENSHOT_FORMAT}
+        if clip:
+            options["clip"] = clip
+        if SCREENSHOT_FORMAT == "jpeg":
+            # Quality is only accepted for lossy formats
+            options["quality"] = SCREENSHOT_QUALITY
+        return await page.screenshot(**options)
+    
+    async def _shoot(self, symbol: str, page: Page) -> str:
+        """Stage 3: take the screenshot and save it unless the chart is unchanged."""
+        data = await self._take_screenshot(page, self._clips.get(symbol))
+        
+        # Periodically reopen the page to keep renderer memory in check
+        self._page_ticks[symbol] += 1
+        if self._page_ticks[symbol] >= PAGE_RECYCLE_TICKS:
+            await self._recycle_page(symbol)
+        
+        # Skip the write when the chart hasn't changed since the last tick
+        digest = xxhash.xxh3_128(data).hexdigest()
+        if self._last_hash.get(symbol) == digest:
+            self.logger.info(f"{symbol} chart unchanged, keeping {self._last_path[symbol]}")
+            return self._last_path[symbol]
+        
+        # Generate filename with timestamp; shots within the same second (e.g.
+        # from capture_batch) get a sequence suffix so no file is overwritten
+        timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+        last_timestamp, seq = self._name_seq.get(symbol, ("", 0))
+        seq = seq + 1 if timestamp == last_timestamp else 0
+        self._name_seq[symbol] = (timestamp, seq)
+        suffix = f"_{seq}" if seq else ""
+        filepath = f"{self._dir_prefix}{symbol}_{timestamp}{suffix}.{SCREENSHOT_EXTENSION}"
+        
+        if THUMBNAIL_SIZES and pyvips is not None:
+            # Detached, so the shoot stage moves on to the next symbol right away
+            task = asyncio.create_task(self._update_thumbnails(symbol, data))
+            self._thumbnail_tasks.add(task)
+            task.add_done_callback(self._thumbnail_tasks.discard)
+            self._latest_thumbnail_task[symbol] = task
+        
+        # Keep the frame in memory; files are written in batches by _flush_symbol
+        self._frames[symbol].append((filepath, data))
+        self._unflushed[symbol] += 1
+        if self._unflushed[symbol] >= FRAME_BUFFER_SIZE:
+            await self._flush_symbol(symbol)
+        
+        self._last_hash[symbol] = digest
+        self._last_path[symbol] = filepath
+        
+        self.logger.info(f"Screenshot captured: {filepath}")
+        return filepath
+    
+    async def _update_thumbnails(self, symbol: str, data: bytes) -> None:
+        """Encode thumbnails in the default executor and publish them when done."""
+        loop = asyncio.get_running_loop()
+        try:
+            thumbnails = await loop.run_in_executor(None, _make_thumbnails, data)
         except Exception as e:
-            self.logger.error(f"Failed to capture screenshot for {symbol}: {e}")
+            self.logger.warning(f"Could not create {symbol} thumbnails: {e}")
+            return
+        
+        # A newer screenshot may have been scheduled meanwhile; only it gets to publish
+        if self._latest_thumbnail_task.get(symbol) is asyncio.current_task():
+            self._thumbnails[symbol] = thumbnails
+            del self._latest_thumbnail_task[symbol]
+    
+    def get_thumbnail(self, symbol: str, size: Tuple[int, int]) -> Optional[bytes]:
+        """Return the latest JPEG thumbnail of a symbol's chart for a configured size."""
+        return self._thumbnails.get(symbol, {}).get(tuple(size))
+    
+    def get_frame(self, symbol: str, index: int = -1) -> Optional[bytes]:
+        """Return the bytes of a buffered frame for a symbol (latest by default)."""
+        try:
+            return self._frames[symbol][index][1]
+        except IndexError:
             return None
-        finally:
-            if page:
-                await page.close()
+    
+    async def _flush_symbol(self, symbol: str) -> int:
+        """Write a symbol's not-yet-saved frames to disk, oldest first.
+        
+        A frame only counts as saved once its write succeeds, so a failed or
+        cancelled flush leaves the remaining frames for the next attempt.
+        Write errors are logged here rather than failing the capture.
+        """
+        async with self._flush_locks[symbol]:
+            frames = self._frames[symbol]
+            pending = self._unflushed.get(symbol, 0)
+            if pending > len(frames):
+                # Writes kept failing until the ring buffer evicted unsaved frames
+                self.logger.error(f"Lost {pending - len(frames)} unsaved {symbol} screenshot(s)")
+                pending = self._unflushed[symbol] = len(frames)
+            if not pending:
+                return 0
+            
+            # Snapshot first so frames appended while writing are left for the next flush
+            written = 0
+            for filepath, data in list(frames)[-pending:]:
+                try:
+                    async with aiofiles.open(filepath, 'wb') as f:
+                        await f.write(data)
+                except OSError as e:
+                    self.logger.error(f"Failed to write {filepath}: {e}")
+                    break
+                self._unflushed[symbol] -= 1
+                written += 1
+        
+        self.logger.info(f"Flushed {written} {symbol} screenshot(s) to disk")
+        return written
+    
+    async def flush_to_disk(self) -> int:
+        """Write all buffered frames that haven't been saved yet."""
+        written = 0
+        for symbol in list(self._unflushed):
+            written += await self._flush_symbol(symbol)
+        return written
+    
+    async def capture_screenshot(self, symbol: str, url: str) -> Optional[str]:
+        """Capture a screenshot for a specific cryptocurrency symbol."""
+        if not self.contexts:
+            raise RuntimeError("Browser not initialized. Call start_browser() first.")
+        
+        async with self._symbol_locks[symbol], self._tabs:
+            try:
+                # Pages stay on the chart between ticks, so only the first tick pays the load
+                page = await self._ensure_page(symbol, url)
+                return await self._shoot(symbol, page)
+            except Exception as e:
+                self.logger.error(f"Failed to capture screenshot for {symbol}: {e}")
+                await self._recycle_page(symbol)
+                return None
+    
+    async def capture_batch(
+        self, jobs: List[Tuple[str, str, datetime]]
+    ) -> Dict[Tuple[str, datetime], Optional[str]]:
+        """Capture many (symbol, url, timestamp) shots on one browser launch.
+        
+        Jobs are grouped by symbol and each symbol reuses a single loaded page,
+        so only the screenshot runs per job. Each shot waits for its timestamp;
+        timestamps in the past are rejected because only the live chart can be
+        captured. Files are named by actual capture time, timestamps key the result.
+        """
+        schedules: Dict[str, List[datetime]] = defaultdict(list)
+        urls: Dict[str, str] = {}
+        for symbol, url, taken_at in jobs:
+            if taken_at < datetime.now(taken_at.tzinfo) - _BATCH_PAST_TOLERANCE:
+                raise ValueError(f"Cannot capture {symbol} at past time {taken_at}")
+            schedules[symbol].append(taken_at)
+            urls[symbol] = url
+        
+        results: Dict[Tuple[str, datetime], Optional[str]] = {}
+        
+        async def run(symbol: str) -> None:
+            for taken_at in sorted(schedules[symbol]):
+                delay = (taken_at - datetime.now(taken_at.tzinfo)).total_seconds()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                results[(symbol, taken_at)] = await self.capture_screenshot(symbol, urls[symbol])
+        
+        await asyncio.gather(*[run(symbol) for symbol in schedules])
+        return results
+    
+    async def _stage_worker(self, inbox: asyncio.Queue, handler, on_error) -> None:
+        """Feed items from a stage queue to handler until cancelled."""
+        while True:
+            item = await inbox.get()
+            symbol = item[0]
+            try:
+                await handler(*item)
+            except Exception as e:
+                self.logger.error(f"Failed to capture screenshot for {symbol}: {e}")
+                await self._recycle_page(symbol)
+                on_error(symbol)
+            finally:
+                inbox.task_done()
     
     async def capture_all_screenshots(self) -> Dict[str, Optional[str]]:
         """Capture screenshots for all configured cryptocurrency symbols."""
-        results = {}
+        if not self.contexts:
+            raise RuntimeError("Browser not initialized. Call start_browser() first.")
         
-        for symbol, url in CRYPTO_SYMBOLS.items():
+        results: Dict[str, Optional[str]] = {symbol: None for symbol in CRYPTO_SYMBOLS}
+        navigate_q: asyncio.Queue = asyncio.Queue()
+        ready_q: asyncio.Queue = asyncio.Queue()
+        shoot_q: asyncio.Queue = asyncio.Queue()
+        held: Set[str] = set()
+        
+        def release(symbol: str) -> None:
+            if symbol in held:
+                held.discard(symbol)
+                self._tabs.release()
+                self._symbol_locks[symbol].release()
+        
+        # Stages are pipelined: while one symbol waits for its chart, another
+        # can be navigating and a third can be encoding its screenshot
+        async def navigate(symbol: str, url: str) -> None:
+            # The symbol lock and a tab slot are held across all stages and
+            # released after the screenshot, or by the worker once a failed
+            # page has been recycled; same order as capture_screenshot
+            await self._symbol_locks[symbol].acquire()
             try:
-                filepath = await self.capture_screenshot(symbol, url)
-                results[symbol] = filepath
-            except Exception as e:
-                self.logger.error(f"Error capturing {symbol}: {e}")
-                results[symbol] = None
+                await self._tabs.acquire()
+            except BaseException:
+                self._symbol_locks[symbol].release()
+                raise
+            held.add(symbol)
+            
+            page = self._cached_page(symbol)
+            if page:
+                # Warm pages skip straight to the screenshot
+                shoot_q.put_nowait((symbol, page))
+            else:
+                ready_q.put_nowait((symbol, await self._navigate(symbol, url)))
+        
+        async def wait_ready(symbol: str, page: Page) -> None:
+            shoot_q.put_nowait((symbol, await self._wait_ready(symbol, page)))
+        
+        async def shoot(symbol: str, page: Page) -> None:
+            results[symbol] = await self._shoot(symbol, page)
+            release(symbol)
+        
+        # Screenshots are serialized inside each Chromium process anyway, so
+        # the last stage only gets one worker per browser instance
+        workers = [
+            asyncio.create_task(self._stage_worker(queue, handler, release))
+            for queue, handler, count in (
+                (navigate_q, navigate, CONCURRENT_TABS),
+                (ready_q, wait_ready, CONCURRENT_TABS),
+                (shoot_q, shoot, len(self.contexts)),
+            )
+            for _ in range(count)
+        ]
+        
+        for symbol, url in CRYPTO_SYMBOLS.items():
+            navigate_q.put_nowait((symbol, url))
+        
+        try:
+            # Each stage hands work on before marking it done, so joining in order drains everything
+            for queue in (navigate_q, ready_q, shoot_q):
+                await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for symbol in list(held):
+                release(symbol)
         
         return results
 
@@ -146,6 +556,7 @@ async def main():
     try:
         await scraper.start_browser()
         results = await scraper.capture_all_screenshots()
+        await scraper.flush_to_disk()
         
         print("Screenshot results:")
         for symbol, filepath in results.items():